@@ -0,0 +1,167 @@
+"""Response cache for LLM calls."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Protocol
+import hashlib
+import json
+import sqlite3
+
+
+class CacheBackend(Protocol):
+    """Storage used by LLMCache."""
+
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """In-process LRU cache backend."""
+
+    def __init__(self, max_size: int = 1024):
+        """Initialize the backend.
+
+        Args:
+            max_size: Maximum number of entries before the least recently
+                used entry is evicted
+        """
+        self.max_size = max_size
+        self._data: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for a key, if any."""
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value under a key."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+
+class DiskBackend:
+    """SQLite cache backend that persists across runs."""
+
+    def __init__(self, path: str):
+        """Open the cache database.
+
+        Args:
+            path: SQLite database path
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for a key, if any."""
+        row = self._conn.execute(
+            "SELECT value FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value under a key."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache(key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        with self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+
+class LLMCache:
+    """Cache of LLM responses keyed by request content."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        """Initialize the cache.
+
+        Args:
+            backend: Storage backend, in-memory LRU by default
+        """
+        self.backend = backend or MemoryBackend()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def cache_key(
+        model: str,
+        messages: List[Any],
+        temperature: float,
+        extra: Iterable[Any] = (),
+    ) -> str:
+        """Build a cache key for an LLM request.
+
+        Args:
+            model: Model name
+            messages: Request messages or prompts
+            temperature: Sampling temperature
+            extra: Additional values that affect the response
+
+        Returns:
+            str: SHA-256 hex digest identifying the request
+        """
+        payload = json.dumps(
+            [model, messages, temperature, list(extra)],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[str]: Cached response if present
+        """
+        value = self.backend.get(key)
+        self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        """Store a response.
+
+        Args:
+            key: Cache key
+            value: LLM response
+        """
+        self.backend.set(key, value)
+
+    async def delete(self, key: str):
+        """Remove a cached response.
+
+        Args:
+            key: Cache key
+        """
+        self.backend.delete(key)
+
+    async def clear(self):
+        """Remove all cached responses."""
+        self.backend.clear()
@@ -37,6 +37,13 @@ class Settings(BaseSettings):
     anthropic_api_key: str = Field(
         default="", description="Anthropic API key for Claude"
     )
+    index_path: str = Field(
+        default=":memory:", description="SQLite metadata index database path"
+    )
+    warmup: bool = Field(
+        default=False,
+        description="Send a warm-up request when the server starts",
+    )
 
     # Test configuration
     is_test: bool = Field(default=False, description="Whether running in test mode")
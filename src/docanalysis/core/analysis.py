@@ -1,48 +1,382 @@
 """Core document analysis functionality."""
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import json
+from functools import lru_cache
+import asyncio
+import hashlib
+import logging
+import re
 
+import orjson
 
-@dataclass
-class AnalysisResult:
-    """Result of document analysis."""
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
-    document_type: str
-    key_entities: List[str]
-    monetary_values: List[float]
-    dates: List[str]
-    key_info: Dict[str, Any]
-    reference_id: Optional[str] = None
-    changes_detected: Optional[Dict[str, Any]] = None
-    confidence_score: float = 0.0
-    metadata: Dict[str, Any] = None
-    source_doc_id: Optional[str] = None
+from ..cache import LLMCache
+from ..ratelimit import AsyncTokenBucket
+from .types import AnalysisConfig, AnalysisResult, DocumentSummary
 
 
-@dataclass
-class DocumentSummary:
-    """Document summary with configurable detail level."""
+logger = logging.getLogger(__name__)
 
-    content: str
-    key_points: List[str]
-    detail_level: str
-    word_count: int
-    source_doc_id: Optional[str] = None
+
+# Each prompt is split into fixed instructions and a per-document tail. The
+# instructions are marked for prompt caching, but at 100-200 tokens they are
+# below the provider's minimum cacheable size, so caching only takes effect
+# if they grow past it.
+_ANALYZE_SCHEMA = """{
+    "document_type": "the document type given with the document",
+    "key_entities": ["list of companies, people, organizations"],
+    "monetary_values": [list of all monetary values as numbers],
+    "dates": ["list of all dates in YYYY-MM-DD format"],
+    "key_info": {
+        "relevant fields based on document type",
+        "include all extracted information"
+    },
+    "source_doc_id": "the document ID given with the document"
+}"""
+
+_ANALYZE_PREFIX = f"""Analyze the document that follows and extract key information.
+
+Provide a detailed analysis in the following JSON structure:
+{_ANALYZE_SCHEMA}
+
+Return ONLY the JSON object, no additional text."""
+
+_ANALYZE_PROMPT = """Document Type: {doc_type}
+
+Document ID: {doc_id}
+
+Key Fields to Extract: {key_fields}
+
+Document Content: {content}"""
+
+_PACKED_PREFIX = f"""Analyze each of the numbered documents that follow.
+
+Provide one analysis per document in the following JSON structure:
+{_ANALYZE_SCHEMA}
+
+Return ONLY a JSON array with one object per document, in document order,
+no additional text."""
+
+_PACKED_SECTION = """===DOC {index} (type={doc_type}, id={doc_id})===
+Key Fields to Extract: {key_fields}
+{content}"""
+
+_SUMMARIZE_PREFIX = """Generate a summary of the document that follows.
+
+Requirements:
+1. For 'brief' summary: Key points only, max 25% of original length
+2. For 'standard' summary: Main points and important details
+3. For 'detailed' summary: Comprehensive coverage with all significant information
+
+Provide the summary in the following JSON structure:
+{
+    "content": "The actual summary text",
+    "key_points": [
+        "list of key points",
+        "important aspects",
+        "critical details"
+    ],
+    "detail_level": "the requested detail level",
+    "word_count": 123
+}
+
+Return ONLY the JSON object, no additional text."""
+
+_SUMMARIZE_PROMPT = """Detail Level: {detail_level}
+
+Document Content: {content}"""
+
+_EXTRACT_PREFIX = """Extract the requested information types from the document.
+
+For each information type, provide a list of relevant items.
+Return results in the following JSON structure:
+{
+    "type1": ["item1", "item2", ...],
+    "type2": ["item1", "item2", ...],
+    ...
+}
+
+Return ONLY the JSON object, no additional text."""
+
+_EXTRACT_PROMPT = """Information Types: {info_types}
+
+Document Content: {content}"""
+
+
+# One alternation so text is scanned once for every kind of value. Entity
+# names are capped at six words of up to 40 characters each, so long runs of
+# capitalized text are scanned in linear time rather than rescanned from
+# every word.
+_VALUE_PATTERN = re.compile(
+    r"(?P<money>\$\d[\d,]*(?:\.\d{2})?)"
+    r"|(?P<date>\b\d{4}-\d{2}-\d{2}\b)"
+    r"|(?P<duration>\b\d+\s+(?:day|week|month|year)s?\b)"
+    r"|(?P<entity>\b(?:[A-Z][\w&]{0,39}\s+){1,6}"
+    r"(?:Inc|Ltd|LLC|Corp|Corporation|Company|GmbH)\b\.?)"
+)
+
+
+def _scan_values(text: str) -> Tuple[List[str], List[float], List[str], List[str]]:
+    """Extract entities, monetary values, dates and durations from text.
+
+    Used when the LLM response cannot be parsed.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        Tuple: Entities, monetary values, ISO dates and durations, in order
+            of appearance
+    """
+    entities: Dict[str, None] = {}
+    values: Dict[float, None] = {}
+    dates: Dict[str, None] = {}
+    durations: Dict[str, None] = {}
+    for match in _VALUE_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "money":
+            values[float(match.group().lstrip("$").replace(",", ""))] = None
+        elif kind == "date":
+            dates[match.group()] = None
+        elif kind == "duration":
+            durations[match.group()] = None
+        else:
+            entities[match.group()] = None
+
+    return list(entities), list(values), list(dates), list(durations)
+
+
+@lru_cache(maxsize=1)
+def load_tokenizer() -> Optional[Any]:
+    """Load the tokenizer used for token estimates, if available.
+
+    The encoding is downloaded on first use, so servers should call this once
+    at startup, off the event loop.
+
+    Returns:
+        Optional[Any]: tiktoken encoding, or None if unavailable
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding server may be unreachable
+        return None
+
+
+# Token counts by text digest, so repeated texts are tokenized once without
+# keeping the texts themselves alive
+_TOKEN_COUNT_CACHE_SIZE = 4096
+_token_counts: OrderedDict[bytes, int] = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text.
+
+    Uses the cl100k_base tokenizer when tiktoken is installed, which tracks
+    Claude's tokenization closely enough for budgeting, and about four
+    characters per token otherwise. Tokenizer counts are cached, so the same
+    document is only tokenized once across analyze, summarize and extract
+    calls.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    encoding = load_tokenizer()
+    if encoding is None:
+        return len(text) // 4
+
+    digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    count = _token_counts.get(digest)
+    if count is None:
+        count = len(encoding.encode(text, disallowed_special=()))
+        _token_counts[digest] = count
+        if len(_token_counts) > _TOKEN_COUNT_CACHE_SIZE:
+            _token_counts.popitem(last=False)
+    else:
+        _token_counts.move_to_end(digest)
+    return count
+
+
+def _chunk_document(
+    content: str, max_tokens: int = 6000, overlap: int = 200
+) -> List[str]:
+    """Split a document into chunks on paragraph boundaries.
+
+    Paragraphs longer than a chunk are split at character boundaries, at
+    about four characters per token. The overlap counts towards each chunk's
+    budget.
+
+    Args:
+        content: Document content
+        max_tokens: Maximum estimated tokens per chunk
+        overlap: Estimated tokens repeated from the end of the previous chunk
+
+    Returns:
+        List[str]: Document chunks in order
+    """
+    max_chars = max_tokens * 4
+    overlap_chars = min(overlap * 4, max_chars // 2)
+
+    paragraphs = []
+    for paragraph in content.split("\n\n"):
+        step = max_chars - overlap_chars
+        paragraphs.extend(
+            paragraph[i : i + max_chars]
+            for i in range(0, max(len(paragraph) - overlap_chars, 1), step)
+        )
+
+    chunks = []
+    current = ""
+    current_tokens = 0
+    for paragraph in paragraphs:
+        # Pieces are joined with a separator and estimates round down, so
+        # budget two extra tokens per piece to keep whole chunks in budget
+        tokens = estimate_tokens(paragraph) + 2
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            tail = current[-overlap_chars:] if overlap_chars else ""
+            tail_tokens = estimate_tokens(tail) + 2 if tail else 0
+            current, current_tokens = (
+                (tail, tail_tokens) if tail_tokens + tokens <= max_tokens else ("", 0)
+            )
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+# Bump whenever a prompt changes so cached responses are not reused
+PROMPT_VERSION = "v2"
+
+# Smallest number of documents worth sending through the Message Batches API
+_MIN_BATCH_SIZE = 4
+
+# Documents estimated above this many tokens are analyzed in chunks
+_CHUNK_THRESHOLD_TOKENS = 6000
+
+# Upper bound on the estimated document tokens sent in one packed prompt
+_MAX_PACK_TOKENS = 100_000
+
+
+@lru_cache(maxsize=128)
+def _types_str(info_types: Tuple[str, ...]) -> str:
+    """Join information types or key fields for a prompt."""
+    return ", ".join(info_types)
 
 
 class DocumentAnalyzer:
     """Core document analysis functionality."""
 
-    def __init__(self, llm_service: Any):
+    def __init__(
+        self,
+        llm_service: Any,
+        config: Optional[AnalysisConfig] = None,
+        cache: Optional[LLMCache] = None,
+    ):
         """Initialize with an LLM service.
 
         Args:
             llm_service: Any service that provides text generation capabilities
+            config: Analysis configuration
+            cache: Optional cache of LLM responses
         """
         self._llm = llm_service
+        self._config = config or AnalysisConfig()
+        self._cache = cache
+        self._request_limit = AsyncTokenBucket(self._config.rate_limit_rpm)
+        self._token_limit = AsyncTokenBucket(self._config.rate_limit_tpm)
+        # Shared by every analysis path so in-flight requests stay bounded
+        # however calls are nested
+        self._request_slots = asyncio.Semaphore(self._config.max_concurrency)
+
+    def _cache_key(self, prompt: str, prefix: str) -> Optional[str]:
+        """Build the response cache key for a prompt.
+
+        Args:
+            prompt: Per-document prompt text
+            prefix: Fixed instructions preceding the prompt
+
+        Returns:
+            Optional[str]: Cache key, or None if responses must not be cached
+        """
+        # Sampled responses differ between calls, so only cache greedy ones
+        if self._cache is None or self._config.temperature != 0:
+            return None
+
+        return self._cache.cache_key(
+            model=getattr(self._llm, "model", ""),
+            messages=[prefix, prompt],
+            temperature=self._config.temperature,
+            extra=[PROMPT_VERSION],
+        )
+
+    async def _generate(
+        self,
+        prompt: str,
+        prefix: str,
+        parse: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """Generate a response, serving repeated prompts from the cache.
+
+        Only responses that parse are cached, so a refusal or malformed
+        response is retried on the next request instead of being pinned.
+
+        Args:
+            prompt: Per-document prompt text
+            prefix: Fixed instructions preceding the prompt
+            parse: Parser the response must pass to be cached, a JSON
+                object parser by default
+
+        Returns:
+            str: LLM response
+        """
+        key = self._cache_key(prompt, prefix)
+        if key is not None:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        async with self._request_slots:
+            await self._request_limit.acquire()
+            await self._token_limit.acquire(estimate_tokens(prefix + prompt))
+            response = await self._llm.generate(
+                prompt, prefix=prefix, temperature=self._config.temperature
+            )
+
+        if key is not None and self._parses(response, parse):
+            await self._cache.set(key, response)
+        return response
+
+    def _parses(
+        self, response: str, parse: Optional[Callable[[str], Any]] = None
+    ) -> bool:
+        """Check whether a response can be parsed.
+
+        Args:
+            response: Raw response from the LLM
+            parse: Parser to try, a JSON object parser by default
+
+        Returns:
+            bool: True if the parser accepts the response
+        """
+        try:
+            (parse or self._parse_llm_response)(response)
+        except Exception:
+            return False
+        return True
 
     def _parse_llm_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response into a dictionary.
@@ -58,8 +392,8 @@ class DocumentAnalyzer:
         """
         try:
             # First try direct JSON parsing
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return orjson.loads(response)
+        except orjson.JSONDecodeError:
             # Find the first { and last } to extract JSON
             start = response.find("{")
             end = response.rfind("}") + 1
@@ -67,7 +401,7 @@ class DocumentAnalyzer:
                 raise ValueError("No JSON object found in response")
 
             json_str = response[start:end]
-            return json.loads(json_str)
+            return orjson.loads(json_str)
 
     async def analyze_document(
         self, content: str, metadata: Dict[str, Any]
@@ -81,32 +415,135 @@ class DocumentAnalyzer:
         Returns:
             AnalysisResult: Analysis results
         """
+        if estimate_tokens(content) <= _CHUNK_THRESHOLD_TOKENS:
+            return await self._analyze_content(content, metadata)
+
+        results = await asyncio.gather(
+            *(
+                self._analyze_content(chunk, metadata)
+                for chunk in _chunk_document(content, _CHUNK_THRESHOLD_TOKENS)
+            )
+        )
+        return self._merge_results(list(results))
+
+    async def _analyze_content(
+        self, content: str, metadata: Dict[str, Any]
+    ) -> AnalysisResult:
+        """Analyze document content with a single request.
+
+        Args:
+            content: Document content
+            metadata: Document metadata
+
+        Returns:
+            AnalysisResult: Analysis results
+        """
+        try:
+            response = await self._generate(
+                self._analysis_prompt(content, metadata), _ANALYZE_PREFIX
+            )
+        except Exception as e:
+            response = None
+
+        return self._analysis_result(response, content, metadata)
+
+    def _merge_results(self, results: List[AnalysisResult]) -> AnalysisResult:
+        """Merge the analysis results of a document's chunks.
+
+        Values found in several chunks, e.g. in the overlap between chunks,
+        are kept once.
+
+        Args:
+            results: Per-chunk analysis results in document order
+
+        Returns:
+            AnalysisResult: Combined analysis results
+        """
+        merged = results[0]
+        for result in results[1:]:
+            merged.key_entities.extend(result.key_entities)
+            merged.monetary_values.extend(result.monetary_values)
+            merged.dates.extend(result.dates)
+            merged.key_info = {**result.key_info, **merged.key_info}
+            merged.confidence_score = min(
+                merged.confidence_score, result.confidence_score
+            )
+
+        merged.key_entities = list(dict.fromkeys(merged.key_entities))
+        merged.monetary_values = list(dict.fromkeys(merged.monetary_values))
+        merged.dates = list(dict.fromkeys(merged.dates))
+        return merged
+
+    def _analysis_prompt(self, content: str, metadata: Dict[str, Any]) -> str:
+        """Build the analysis prompt for a document.
+
+        Args:
+            content: Document content
+            metadata: Document metadata
+
+        Returns:
+            str: Prompt text
+        """
         doc_type = metadata.get("type", "unknown")
-        prompt = f"""Analyze the following document and extract key information.
+        return _ANALYZE_PROMPT.format(
+            content=content,
+            doc_type=doc_type,
+            doc_id=metadata.get("id", ""),
+            key_fields=self._key_fields(doc_type),
+        )
 
-Document Content: {content}
+    def _key_fields(self, doc_type: str) -> str:
+        """Get the configured key fields for a document type.
 
-Document Type: {doc_type}
+        Args:
+            doc_type: Document type
 
-Provide a detailed analysis in the following JSON structure:
-{{
-    "document_type": "{doc_type}",
-    "key_entities": ["list of companies, people, organizations"],
-    "monetary_values": [list of all monetary values as numbers],
-    "dates": ["list of all dates in YYYY-MM-DD format"],
-    "key_info": {{
-        "relevant fields based on document type",
-        "include all extracted information"
-    }},
-    "source_doc_id": "{metadata.get('id', '')}"
-}}
+        Returns:
+            str: Comma-separated key fields, empty for unconfigured types
+        """
+        doc_config = self._config.document_types.get(doc_type, {})
+        return _types_str(tuple(doc_config.get("key_fields", ())))
 
-Return ONLY the JSON object, no additional text."""
+    def _analysis_result(
+        self, response: Optional[str], content: str, metadata: Dict[str, Any]
+    ) -> AnalysisResult:
+        """Build an analysis result from an LLM response.
 
+        Args:
+            response: Raw LLM response, or None if the request failed
+            content: Document content
+            metadata: Document metadata
+
+        Returns:
+            AnalysisResult: Parsed results, or pattern-based extraction from
+                the document itself if the response is missing or unusable
+        """
         try:
-            # Update to use generate instead of generate_str for pydantic-based Agent
-            response = await self._llm.generate(prompt)
             result_dict = self._parse_llm_response(response)
+        except Exception as e:
+            result_dict = None
+
+        return self._result_from_dict(result_dict, content, metadata)
+
+    def _result_from_dict(
+        self,
+        result_dict: Optional[Dict[str, Any]],
+        content: str,
+        metadata: Dict[str, Any],
+    ) -> AnalysisResult:
+        """Build an analysis result from a parsed LLM response.
+
+        Args:
+            result_dict: Parsed response, or None if there is none
+            content: Document content
+            metadata: Document metadata
+
+        Returns:
+            AnalysisResult: Analysis results, or pattern-based extraction from
+                the document itself if the parsed response is unusable
+        """
+        try:
+            result_dict = dict(result_dict)
 
             # Add source document ID if available and not already included
             if "source_doc_id" not in result_dict and "id" in metadata:
@@ -115,13 +552,13 @@ Return ONLY the JSON object, no additional text."""
             # Use dict unpacking to create the result
             return AnalysisResult(**result_dict)
         except Exception as e:
-            # Return basic analysis on error
+            entities, values, dates, durations = _scan_values(content)
             return AnalysisResult(
-                document_type=doc_type,
-                key_entities=[],
-                monetary_values=[],
-                dates=[],
-                key_info={},
+                document_type=metadata.get("type", "unknown"),
+                key_entities=entities,
+                monetary_values=values,
+                dates=dates,
+                key_info={"durations": durations} if durations else {},
                 source_doc_id=metadata.get("id", ""),
             )
 
@@ -139,12 +576,23 @@ Return ONLY the JSON object, no additional text."""
         Returns:
             List[AnalysisResult]: Analysis results for each document
         """
-        results = []
-        for doc in documents:
-            result = await self.analyze_document(
-                content=doc["content"], metadata=doc.get("metadata", {})
+        if (
+            self._config.use_batch_api
+            and len(documents) >= _MIN_BATCH_SIZE
+            and hasattr(self._llm, "generate_batch")
+        ):
+            results = await self.analyze_documents_batch(documents)
+        else:
+            results = list(
+                await asyncio.gather(
+                    *(
+                        self.analyze_document(
+                            content=doc["content"], metadata=doc.get("metadata", {})
+                        )
+                        for doc in documents
+                    )
+                )
             )
-            results.append(result)
 
         # Process relationships if provided
         if relationships:
@@ -155,8 +603,226 @@ Return ONLY the JSON object, no additional text."""
                     ):
                         results[i].relationships = related_docs
 
+        self._link_references(documents, results)
         return results
 
+    def _link_references(
+        self, documents: List[Dict[str, Any]], results: List[AnalysisResult]
+    ):
+        """Record references between the analyzed documents.
+
+        A document whose metadata has a ``reference_id`` naming another
+        document in the set is linked to it in both directions.
+
+        Args:
+            documents: Analyzed documents
+            results: Analysis results in document order
+        """
+        doc_map = {}
+        for i, doc in enumerate(documents):
+            doc_id = doc.get("metadata", {}).get("id")
+            if doc_id:
+                doc_map[doc_id] = i
+
+        related = [set(result.related_docs) for result in results]
+        for i, doc in enumerate(documents):
+            metadata = doc.get("metadata", {})
+            ref = metadata.get("reference_id")
+            if ref and ref in doc_map and metadata.get("id"):
+                related[doc_map[ref]].add(metadata["id"])
+                related[i].add(ref)
+
+        for result, doc_ids in zip(results, related):
+            result.related_docs = sorted(doc_ids)
+
+    async def analyze_documents_batch(
+        self, documents: List[Dict[str, Any]], poll_interval: float = 5.0
+    ) -> List[AnalysisResult]:
+        """Analyze multiple documents in a single provider-side batch.
+
+        Requires an LLM service with a ``generate_batch`` method. Documents
+        too long for a single request are analyzed in chunks instead. The
+        batch is cancelled after ``AnalysisConfig.batch_timeout`` seconds.
+
+        Args:
+            documents: List of documents
+            poll_interval: Seconds to wait between batch status checks
+
+        Returns:
+            List[AnalysisResult]: Analysis results in document order
+        """
+        long_docs = [
+            i
+            for i, doc in enumerate(documents)
+            if estimate_tokens(doc["content"]) > _CHUNK_THRESHOLD_TOKENS
+        ]
+
+        # Positional IDs are always unique and valid batch custom_ids
+        prompts = {
+            f"doc-{i}": self._analysis_prompt(doc["content"], doc.get("metadata", {}))
+            for i, doc in enumerate(documents)
+            if i not in long_docs
+        }
+
+        # Long documents are chunked while the batch is processed
+        responses, *chunked = await asyncio.gather(
+            self._generate_batch(prompts, poll_interval),
+            *(
+                self.analyze_document(
+                    documents[i]["content"], documents[i].get("metadata", {})
+                )
+                for i in long_docs
+            ),
+        )
+        chunked_results = dict(zip(long_docs, chunked))
+
+        return [
+            chunked_results.get(i)
+            or self._analysis_result(
+                responses.get(f"doc-{i}"), doc["content"], doc.get("metadata", {})
+            )
+            for i, doc in enumerate(documents)
+        ]
+
+    async def _generate_batch(
+        self, prompts: Dict[str, str], poll_interval: float
+    ) -> Dict[str, str]:
+        """Generate analysis responses for prompts as a provider-side batch.
+
+        Prompts with a cached response are not submitted.
+
+        Args:
+            prompts: Analysis prompts keyed by batch custom_id
+            poll_interval: Seconds to wait between batch status checks
+
+        Returns:
+            Dict[str, str]: Responses keyed by custom_id; prompts whose
+                request failed are omitted
+        """
+        responses = {}
+        keys = {
+            custom_id: self._cache_key(p, _ANALYZE_PREFIX)
+            for custom_id, p in prompts.items()
+        }
+        for custom_id, key in keys.items():
+            if key is not None:
+                cached = await self._cache.get(key)
+                if cached is not None:
+                    responses[custom_id] = cached
+        pending = {k: p for k, p in prompts.items() if k not in responses}
+        if not pending:
+            return responses
+
+        try:
+            generated = await self._llm.generate_batch(
+                pending,
+                prefix=_ANALYZE_PREFIX,
+                poll_interval=poll_interval,
+                timeout=self._config.batch_timeout,
+                temperature=self._config.temperature,
+            )
+        except Exception as e:
+            logger.error(
+                f"Batch analysis of {len(pending)} documents failed, "
+                f"falling back to pattern extraction: {e!r}"
+            )
+            generated = {}
+
+        for custom_id, response in generated.items():
+            responses[custom_id] = response
+            if keys[custom_id] is not None and self._parses(response):
+                await self._cache.set(keys[custom_id], response)
+        return responses
+
+    async def analyze_documents_packed(
+        self, documents: List[Dict[str, Any]], pack_size: int = 8
+    ) -> List[AnalysisResult]:
+        """Analyze multiple documents with several documents per request.
+
+        Documents are grouped into packs of up to ``pack_size`` documents, kept
+        under an estimated token budget, and each pack is analyzed with a
+        single prompt asking for one result per document.
+
+        Args:
+            documents: List of documents
+            pack_size: Maximum number of documents per request
+
+        Returns:
+            List[AnalysisResult]: Analysis results in document order
+        """
+        packs: List[List[Dict[str, Any]]] = []
+        tokens = 0
+        for doc in documents:
+            doc_tokens = estimate_tokens(doc["content"])
+            if (
+                not packs
+                or len(packs[-1]) >= pack_size
+                or tokens + doc_tokens > _MAX_PACK_TOKENS
+            ):
+                packs.append([])
+                tokens = 0
+            packs[-1].append(doc)
+            tokens += doc_tokens
+
+        async def analyze(pack: List[Dict[str, Any]]) -> List[AnalysisResult]:
+            sections = []
+            for i, doc in enumerate(pack, 1):
+                doc_type = doc.get("metadata", {}).get("type", "unknown")
+                sections.append(
+                    _PACKED_SECTION.format(
+                        index=i,
+                        doc_type=doc_type,
+                        doc_id=doc.get("metadata", {}).get("id", ""),
+                        key_fields=self._key_fields(doc_type),
+                        content=doc["content"],
+                    )
+                )
+            prompt = "\n\n".join(sections)
+            try:
+                response = await self._generate(
+                    prompt, _PACKED_PREFIX, parse=self._parse_llm_array
+                )
+                items = self._parse_llm_array(response)
+            except Exception as e:
+                items = []
+
+            # Documents without a matching array element fall back to
+            # pattern extraction
+            if len(items) != len(pack):
+                items = [None] * len(pack)
+            return [
+                self._result_from_dict(item, doc["content"], doc.get("metadata", {}))
+                for item, doc in zip(items, pack)
+            ]
+
+        packed = await asyncio.gather(*(analyze(pack) for pack in packs))
+        return [result for results in packed for result in results]
+
+    def _parse_llm_array(self, response: str) -> List[Any]:
+        """Parse an LLM response holding a JSON array.
+
+        Args:
+            response: Raw response from the LLM
+
+        Returns:
+            List[Any]: Parsed array elements
+
+        Raises:
+            ValueError: If response cannot be parsed
+        """
+        try:
+            parsed = orjson.loads(response)
+        except orjson.JSONDecodeError:
+            start = response.find("[")
+            end = response.rfind("]") + 1
+            if start == -1 or end == 0:
+                raise ValueError("No JSON array found in response")
+            parsed = orjson.loads(response[start:end])
+
+        if not isinstance(parsed, list):
+            raise ValueError("Response is not a JSON array")
+        return parsed
+
     async def summarize_document(
         self, content: str, metadata: Dict[str, Any], detail_level: str = "standard"
     ) -> DocumentSummary:
@@ -174,32 +840,10 @@ Return ONLY the JSON object, no additional text."""
         if detail_level not in ["brief", "standard", "detailed"]:
             detail_level = "standard"
 
-        prompt = f"""Generate a {detail_level} summary of the following document.
-
-Document Content: {content}
-
-Requirements:
-1. For 'brief' summary: Key points only, max 25% of original length
-2. For 'standard' summary: Main points and important details
-3. For 'detailed' summary: Comprehensive coverage with all significant information
-
-Provide the summary in the following JSON structure:
-{{
-    "content": "The actual summary text",
-    "key_points": [
-        "list of key points",
-        "important aspects",
-        "critical details"
-    ],
-    "detail_level": "{detail_level}",
-    "word_count": 123
-}}
-
-Return ONLY the JSON object, no additional text."""
+        prompt = _SUMMARIZE_PROMPT.format(content=content, detail_level=detail_level)
 
         try:
-            # Update to use generate instead of generate_str for pydantic-based Agent
-            response = await self._llm.generate(prompt)
+            response = await self._generate(prompt, _SUMMARIZE_PREFIX)
             result_dict = self._parse_llm_response(response)
 
             # Add source document ID if available
@@ -232,25 +876,12 @@ Return ONLY the JSON object, no additional text."""
         Returns:
             Dict[str, Any]: Extracted information by type
         """
-        info_types_str = ", ".join(info_types)
-        prompt = f"""Extract the following information types from the document:
-{info_types_str}
-
-Document Content: {content}
-
-For each information type, provide a list of relevant items.
-Return results in the following JSON structure:
-{{
-    "type1": ["item1", "item2", ...],
-    "type2": ["item1", "item2", ...],
-    ...
-}}
-
-Return ONLY the JSON object, no additional text."""
+        prompt = _EXTRACT_PROMPT.format(
+            info_types=_types_str(tuple(info_types)), content=content
+        )
 
         try:
-            # Update to use generate instead of generate_str for pydantic-based Agent
-            response = await self._llm.generate(prompt)
+            response = await self._generate(prompt, _EXTRACT_PREFIX)
             return self._parse_llm_response(response)
         except Exception as e:
             # Return empty results on error
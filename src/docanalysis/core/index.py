@@ -0,0 +1,144 @@
+"""SQLite-backed metadata index for document search."""
+
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+import asyncio
+import sqlite3
+import threading
+
+from ..config import settings
+
+
+class MetadataIndex:
+    """Index over document date, type and category for filtered search.
+
+    Entries are scoped to a collection, so stores for different collections
+    can share one index database. Queries run in a worker thread to keep
+    the event loop free.
+    """
+
+    def __init__(self, path: str = None, collection: str = ""):
+        """Open the index database and ensure the schema exists.
+
+        Args:
+            path: SQLite database path (":memory:" for a transient index)
+            collection: Name of the collection whose documents are indexed
+        """
+        self.path = path or settings.index_path
+        self.collection = collection
+        # Calls come from worker threads, one at a time under the lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                date TEXT,
+                type TEXT,
+                category TEXT,
+                PRIMARY KEY (collection, id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_dtc
+                ON docs(collection, date, type, category, id);
+            """
+        )
+
+    async def add(self, doc_id: str, metadata: Dict[str, Any]):
+        """Insert or replace the index entry for a document.
+
+        Args:
+            doc_id: Document ID
+            metadata: Document metadata
+        """
+        await self.add_many([(doc_id, metadata)])
+
+    async def add_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Insert or replace the index entries for several documents at once.
+
+        Args:
+            entries: Document ID and metadata pairs
+        """
+        rows = [
+            (
+                self.collection,
+                doc_id,
+                metadata.get("date"),
+                metadata.get("type"),
+                metadata.get("category"),
+            )
+            for doc_id, metadata in entries
+        ]
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO docs(collection, id, date, type, category) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    async def search(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> List[str]:
+        """Find IDs of documents matching all given filters.
+
+        Args:
+            start_date: Start date (YYYY-MM-DD), inclusive
+            end_date: End date (YYYY-MM-DD), inclusive
+            doc_type: Filter by document type
+            category: Filter by category
+
+        Returns:
+            List[str]: Matching document IDs ordered by date
+        """
+        clauses = ["collection = ?"]
+        params = [self.collection]
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        if doc_type:
+            clauses.append("type = ?")
+            params.append(doc_type)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+
+        query = "SELECT id FROM docs WHERE " + " AND ".join(clauses)
+        query += " ORDER BY date, id"
+
+        rows = await asyncio.to_thread(self._query, query, params)
+        return [row[0] for row in rows]
+
+    async def count(self) -> int:
+        """Count the indexed documents of the collection.
+
+        Returns:
+            int: Number of index entries
+        """
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT COUNT(*) FROM docs WHERE collection = ?",
+            [self.collection],
+        )
+        return rows[0][0]
+
+    async def clear(self):
+        """Remove all entries of the collection from the index."""
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM docs WHERE collection = ?", [(self.collection,)]
+        )
+
+    def _query(self, query: str, params: List[Any]) -> List[Tuple]:
+        """Run a read query and fetch all rows."""
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def _execute(self, statement: str, rows: List[Tuple]):
+        """Run a write statement for each row in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(statement, rows)
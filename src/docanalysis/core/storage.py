@@ -1,23 +1,44 @@
 """Core document storage functionality."""
 
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 import base64
-import tempfile
+import copy
+import hashlib
+import io
+import time
 
 import chromadb
 import pypdf
 
 from ..config import settings
+from .index import MetadataIndex
 
 
 class DocumentStore:
     """Document storage service with vector database integration."""
 
+    # Maximum number of cached similarity query results
+    SIMILARITY_CACHE_SIZE = 1024
+
+    # Seconds a cached similarity result is used; writes from other clients
+    # of a shared ChromaDB server are only picked up once it expires
+    SIMILARITY_CACHE_TTL = 60.0
+
+    # Maximum number of cached PDF text extractions
+    PDF_TEXT_CACHE_SIZE = 128
+
+    # Documents read per request when rebuilding the metadata index
+    INDEX_REBUILD_BATCH_SIZE = 1000
+
     def __init__(
         self,
         collection_name: str = None,
         host: str = None,
         port: int = None,
+        client: Optional[chromadb.ClientAPI] = None,
+        embedding_function: Optional[Any] = None,
+        index: Optional[MetadataIndex] = None,
     ):
         """Initialize the document store.
 
@@ -25,43 +46,93 @@ class DocumentStore:
             collection_name: Name of the vector DB collection
             host: Database server host
             port: Database server port
+            client: Existing ChromaDB client (e.g. an in-process
+                ``chromadb.EphemeralClient``) to use instead of connecting
+                to ``host``/``port``
+            embedding_function: ChromaDB embedding function to use instead of
+                the collection default, e.g. an INT8-quantized ONNX model
+            index: Metadata index used for filtered search, by default an
+                index of this collection at ``settings.index_path``
         """
         self.collection_name = collection_name or settings.chroma.collection_name
         self.host = host or settings.chroma.host
         self.port = port or settings.chroma.port
-        self.client = chromadb.HttpClient(host=self.host, port=self.port)
+        self.client = client or chromadb.HttpClient(host=self.host, port=self.port)
+        self.embedding_function = embedding_function
+        self.index = index or MetadataIndex(collection=self.collection_name)
         self.collection = None
+        # Cache time and similar documents by (doc_id, limit); cleared whenever
+        # this store changes documents
+        self._similar_cache: OrderedDict[
+            Tuple[str, int], Tuple[float, List[Dict[str, Any]]]
+        ] = OrderedDict()
+        # Extracted PDF text by content digest
+        self._pdf_text_cache: OrderedDict[bytes, str] = OrderedDict()
 
     async def initialize(self):
-        """Initialize the vector database collection."""
+        """Initialize the vector database collection.
+
+        An empty metadata index is rebuilt from the collection, which reads
+        the metadata of every stored document. Use a persistent
+        ``settings.index_path`` to skip this on later starts.
+        """
+        # Passing None would disable embeddings, so only pass an override
+        kwargs = {}
+        if self.embedding_function is not None:
+            kwargs["embedding_function"] = self.embedding_function
+
         try:
             self.collection = self.client.get_or_create_collection(
                 name=self.collection_name,
                 metadata={"hnsw:space": "cosine"},  # Using cosine similarity
+                **kwargs,
             )
         except Exception as e:
             raise RuntimeError(f"Failed to initialize vector database collection: {e}")
 
+        if await self.index.count():
+            return
+
+        # Index documents persisted before this store was created, a page at
+        # a time to bound memory use
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=["metadatas"],
+                limit=self.INDEX_REBUILD_BATCH_SIZE,
+                offset=offset,
+            )
+            if not page["ids"]:
+                break
+            await self.index.add_many(
+                zip(page["ids"], (m or {} for m in page["metadatas"]))
+            )
+            offset += len(page["ids"])
+
     def _extract_pdf_text(self, pdf_data: bytes) -> str:
         """Extract text from PDF data.
 
+        Text is cached by content digest, so a PDF seen before is not parsed
+        again.
+
         Args:
             pdf_data: Raw PDF bytes
 
         Returns:
             str: Extracted text content
         """
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=True) as tmp_file:
-            tmp_file.write(pdf_data)
-            tmp_file.flush()
+        digest = hashlib.blake2b(pdf_data, digest_size=16).digest()
+        if digest in self._pdf_text_cache:
+            self._pdf_text_cache.move_to_end(digest)
+            return self._pdf_text_cache[digest]
 
-            text_content = []
-            with open(tmp_file.name, "rb") as pdf_file:
-                pdf_reader = pypdf.PdfReader(pdf_file)
-                for page in pdf_reader.pages:
-                    text_content.append(page.extract_text())
+        pdf_reader = pypdf.PdfReader(io.BytesIO(pdf_data))
+        text = "\n".join(page.extract_text() for page in pdf_reader.pages)
 
-            return "\n".join(text_content)
+        self._pdf_text_cache[digest] = text
+        if len(self._pdf_text_cache) > self.PDF_TEXT_CACHE_SIZE:
+            self._pdf_text_cache.popitem(last=False)
+        return text
 
     def _get_document_content(self, document: Dict[str, Any]) -> str:
         """Extract text content from document.
@@ -76,7 +147,10 @@ class DocumentStore:
         if isinstance(content, str):
             return content
         elif isinstance(content, dict) and content["type"] == "pdf":
-            pdf_data = base64.b64decode(content["data"])
+            # Raw bytes are used as is; strings are base64 for JSON transport
+            pdf_data = content["data"]
+            if isinstance(pdf_data, str):
+                pdf_data = base64.b64decode(pdf_data)
             return self._extract_pdf_text(pdf_data)
         elif isinstance(content, bytes):
             return self._extract_pdf_text(content)
@@ -111,34 +185,50 @@ class DocumentStore:
         Returns:
             str: Document ID
         """
+        return (await self.store_documents([document]))[0]
+
+    async def store_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Store several documents in the collection with a single write.
+
+        New documents are inserted and existing ones replaced. Embeddings for
+        all documents are computed in one batch.
+
+        Args:
+            documents: Document dictionaries with id, content, and metadata;
+                IDs must be unique within the batch
+
+        Returns:
+            List[str]: Document IDs in input order
+        """
         if not self.collection:
             raise RuntimeError("Collection not initialized")
 
-        if isinstance(document.get("content"), (dict, bytes)):
-            document = self.prepare_document(document)
+        if not documents:
+            return []
 
-        doc_id = document["id"]
-        content = document["content"]
-        metadata = document.get("metadata", {}).copy()
+        ids, contents, metadatas = [], [], []
+        for document in documents:
+            if isinstance(document.get("content"), (dict, bytes)):
+                document = self.prepare_document(document)
 
-        if not metadata:
-            metadata = {"type": "document"}
+            metadata = document.get("metadata", {}).copy()
+            if not metadata:
+                metadata = {"type": "document"}
 
-        # Convert complex types to strings for ChromaDB
-        for key, value in metadata.items():
-            if isinstance(value, (list, dict)):
-                metadata[key] = str(value)
+            # Convert complex types to strings for ChromaDB
+            for key, value in metadata.items():
+                if isinstance(value, (list, dict)):
+                    metadata[key] = str(value)
 
-        # Update or insert document
-        existing_doc = await self.get_document(doc_id)
-        if existing_doc:
-            self.collection.update(
-                ids=[doc_id], documents=[content], metadatas=[metadata]
-            )
-        else:
-            self.collection.add(ids=[doc_id], documents=[content], metadatas=[metadata])
+            ids.append(document["id"])
+            contents.append(document["content"])
+            metadatas.append(metadata)
+
+        self.collection.upsert(ids=ids, documents=contents, metadatas=metadatas)
+        await self.index.add_many(zip(ids, metadatas))
+        self._similar_cache.clear()
 
-        return doc_id
+        return ids
 
     async def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a document by ID.
@@ -162,6 +252,64 @@ class DocumentStore:
             "metadata": result["metadatas"][0],
         }
 
+    async def get_documents(self, doc_ids: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve several documents by ID in a single query.
+
+        Args:
+            doc_ids: Document IDs
+
+        Returns:
+            List[Dict]: Documents found, in the order of ``doc_ids``
+        """
+        if not self.collection:
+            raise RuntimeError("Collection not initialized")
+
+        if not doc_ids:
+            return []
+
+        result = self.collection.get(ids=doc_ids, include=["documents", "metadatas"])
+        found = {
+            doc_id: {"id": doc_id, "content": content, "metadata": metadata}
+            for doc_id, content, metadata in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        }
+
+        return [found[doc_id] for doc_id in doc_ids if doc_id in found]
+
+    async def search_documents(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Find documents matching all given metadata filters.
+
+        Filters are answered from the metadata index, which only sees this
+        store's writes. Documents written by other clients of a shared
+        ChromaDB server are found after the index is rebuilt, so deployments
+        relying on search should have a single writer per collection.
+
+        Args:
+            start_date: Start date (YYYY-MM-DD), inclusive
+            end_date: End date (YYYY-MM-DD), inclusive
+            doc_type: Filter by document type
+            category: Filter by category
+
+        Returns:
+            List[Dict]: Matching documents ordered by date
+        """
+        doc_ids = await self.index.search(
+            start_date=start_date,
+            end_date=end_date,
+            doc_type=doc_type,
+            category=category,
+        )
+
+        # Only fetch full documents for the matching IDs
+        return await self.get_documents(doc_ids)
+
     async def find_similar_documents(
         self, doc_id: str, limit: int = 5
     ) -> List[Dict[str, Any]]:
@@ -177,12 +325,23 @@ class DocumentStore:
         if not self.collection:
             raise RuntimeError("Collection not initialized")
 
-        ref_doc = await self.get_document(doc_id)
-        if not ref_doc:
+        key = (doc_id, limit)
+        cached = self._similar_cache.get(key)
+        if cached is not None:
+            cached_at, similar_docs = cached
+            if time.monotonic() - cached_at < self.SIMILARITY_CACHE_TTL:
+                self._similar_cache.move_to_end(key)
+                # Callers may modify the documents they get
+                return copy.deepcopy(similar_docs)
+            del self._similar_cache[key]
+
+        # Query with the stored embedding instead of re-embedding the text
+        ref_doc = self.collection.get(ids=[doc_id], include=["embeddings"])
+        if not ref_doc["ids"]:
             return []
 
         results = self.collection.query(
-            query_texts=[ref_doc["content"]],
+            query_embeddings=[ref_doc["embeddings"][0]],
             n_results=limit + 1,  # Add 1 to account for the reference document
         )
 
@@ -197,7 +356,39 @@ class DocumentStore:
                     }
                 )
 
-        return similar_docs
+        self._similar_cache[key] = (time.monotonic(), similar_docs)
+        if len(self._similar_cache) > self.SIMILARITY_CACHE_SIZE:
+            self._similar_cache.popitem(last=False)
+        return copy.deepcopy(similar_docs)
+
+    async def find_referencing_documents(self, doc_id: str) -> List[Dict[str, Any]]:
+        """Find documents whose metadata references a document.
+
+        Args:
+            doc_id: Referenced document ID
+
+        Returns:
+            List[Dict]: Documents with ``reference_id`` equal to ``doc_id``
+        """
+        if not self.collection:
+            raise RuntimeError("Collection not initialized")
+
+        # Served by the collection's metadata index rather than a scan
+        results = self.collection.get(
+            where={"reference_id": doc_id},
+            include=["documents", "metadatas"],
+        )
+
+        return [
+            {
+                "id": result_id,
+                "content": content,
+                "metadata": metadata,
+            }
+            for result_id, content, metadata in zip(
+                results["ids"], results["documents"], results["metadatas"]
+            )
+        ]
 
     async def find_documents_by_date(
         self, start_date: str, end_date: str
@@ -265,4 +456,6 @@ class DocumentStore:
         """Clear all documents from the collection."""
         if self.collection:
             self.client.delete_collection(self.collection_name)
+            self._similar_cache.clear()
+            await self.index.clear()
             await self.initialize()
@@ -1,11 +1,12 @@
 """Core type definitions for document analysis."""
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional
 from datetime import datetime
+from types import MappingProxyType
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     """Represents a document with its content and metadata."""
 
@@ -34,7 +35,7 @@ class Document:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentSummary:
     """Summary of a document's content."""
 
@@ -59,50 +60,22 @@ class DocumentSummary:
         }
 
 
-@dataclass
-class Entity:
-    """Named entity found in a document."""
-
-    name: str
-    type: str  # e.g., "person", "organization", "location"
-    context: Optional[str] = None
-    confidence: float = 1.0
-
-
-@dataclass
-class MonetaryValue:
-    """Monetary value found in a document."""
-
-    amount: float
-    currency: str
-    context: Optional[str] = None
-    confidence: float = 1.0
-
-
-@dataclass
-class DateReference:
-    """Date reference found in a document."""
-
-    date: datetime
-    context: Optional[str] = None
-    type: Optional[str] = None  # e.g., "effective_date", "expiry_date"
-    confidence: float = 1.0
-
-
-@dataclass
+@dataclass(slots=True)
 class AnalysisResult:
     """Results from document analysis."""
 
     document_type: str  # e.g., "contract", "invoice", "report"
-    key_entities: List[Entity] = field(default_factory=list)
-    monetary_values: List[MonetaryValue] = field(default_factory=list)
-    dates: List[DateReference] = field(default_factory=list)
+    key_entities: List[str] = field(default_factory=list)
+    monetary_values: List[float] = field(default_factory=list)
+    dates: List[str] = field(default_factory=list)  # YYYY-MM-DD
     key_info: Dict[str, Any] = field(default_factory=dict)
     reference_id: Optional[str] = None
     changes_detected: Optional[Dict[str, Any]] = None
     confidence_score: float = 0.0
     metadata: Dict[str, Any] = field(default_factory=dict)
     source_doc_id: Optional[str] = None
+    relationships: List[Dict[str, Any]] = field(default_factory=list)
+    related_docs: List[str] = field(default_factory=list)  # Referencing/referenced IDs
 
     def model_dump(self) -> Dict[str, Any]:
         """Convert the analysis result to a dictionary.
@@ -112,69 +85,69 @@ class AnalysisResult:
         """
         return {
             "document_type": self.document_type,
-            "key_entities": [
-                {
-                    "name": e.name,
-                    "type": e.type,
-                    "context": e.context,
-                    "confidence": e.confidence,
-                }
-                for e in self.key_entities
-            ],
-            "monetary_values": [
-                {
-                    "amount": v.amount,
-                    "currency": v.currency,
-                    "context": v.context,
-                    "confidence": v.confidence,
-                }
-                for v in self.monetary_values
-            ],
-            "dates": [
-                {
-                    "date": d.date.isoformat(),
-                    "context": d.context,
-                    "type": d.type,
-                    "confidence": d.confidence,
-                }
-                for d in self.dates
-            ],
+            "key_entities": self.key_entities,
+            "monetary_values": self.monetary_values,
+            "dates": self.dates,
             "key_info": self.key_info,
             "reference_id": self.reference_id,
             "changes_detected": self.changes_detected,
             "confidence_score": self.confidence_score,
             "metadata": self.metadata,
             "source_doc_id": self.source_doc_id,
+            "relationships": self.relationships,
+            "related_docs": self.related_docs,
         }
 
 
+# Shared read-only defaults; copy with dict() before customizing
+_DEFAULT_DOCUMENT_TYPES: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {
+        "contract": MappingProxyType(
+            {
+                "key_fields": (
+                    "parties",
+                    "value",
+                    "duration",
+                    "services",
+                    "deliverables",
+                )
+            }
+        ),
+        "amendment": MappingProxyType(
+            {
+                "key_fields": (
+                    "changes",
+                    "value_changes",
+                    "timeline_changes",
+                    "scope_changes",
+                )
+            }
+        ),
+        "report": MappingProxyType(
+            {
+                "key_fields": (
+                    "metrics",
+                    "progress",
+                    "challenges",
+                    "next_steps",
+                )
+            }
+        ),
+    }
+)
+
+
+@dataclass
 class AnalysisConfig:
     """Configuration for document analysis."""
 
-    document_types: Dict[str, Dict[str, List[str]]] = {
-        "contract": {
-            "key_fields": [
-                "parties",
-                "value",
-                "duration",
-                "services",
-                "deliverables",
-            ]
-        },
-        "amendment": {
-            "key_fields": [
-                "changes",
-                "value_changes",
-                "timeline_changes",
-                "scope_changes",
-            ]
-        },
-        "report": {
-            "key_fields": [
-                "metrics",
-                "progress",
-                "challenges",
-                "next_steps",
-            ]
-        },
-    }
+    # dataclasses reject unhashable defaults, so hand out the shared mapping
+    document_types: Mapping[str, Mapping[str, Any]] = field(
+        default_factory=lambda: _DEFAULT_DOCUMENT_TYPES
+    )
+    temperature: float = 0.0  # Responses are only cached at 0.0
+    max_concurrency: int = 10  # Concurrent LLM requests
+    rate_limit_rpm: int = 100  # LLM requests per minute
+    rate_limit_tpm: int = 100_000  # Estimated LLM input tokens per minute
+    use_batch_api: bool = False  # Analyze document sets as provider-side batches
+    batch_timeout: float = 3600.0  # Seconds to wait before cancelling a batch
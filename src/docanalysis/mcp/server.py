@@ -1,12 +1,20 @@
 """FastMCP server implementation for document analysis."""
 
 from typing import Dict, List, Any, Optional
+import asyncio
 import logging
 import os
 
 from mcp.server.fastmcp import FastMCP
 
-from ..core.analysis import DocumentAnalyzer, AnalysisResult, DocumentSummary
+from ..cache import LLMCache
+from ..config import settings
+from ..core.analysis import (
+    DocumentAnalyzer,
+    AnalysisResult,
+    DocumentSummary,
+    load_tokenizer,
+)
 from ..core.storage import DocumentStore
 from ..models.anthropic_agent import AnthropicAgent
 from .tools import document_tools
@@ -18,16 +26,23 @@ logger = logging.getLogger(__name__)
 class FastMCPDocumentAnalysisServer:
     """FastMCP server that exposes document analysis capabilities."""
 
-    def __init__(self):
-        """Initialize the FastMCP document analysis server."""
+    def __init__(self, doc_store: Optional[DocumentStore] = None):
+        """Initialize the FastMCP document analysis server.
+
+        Args:
+            doc_store: Document store to use instead of the configured default
+        """
         self._mcp = FastMCP(
             "Document Analysis",
             description="Document analysis, summarization, and relationship mapping",
             version="2.0.0",
         )
+        self._agent = None
+        self._warmup_task = None
         self._analyzer = None
-        self._doc_store = None
+        self._doc_store = doc_store
         self._initialized = False
+        self._init_lock = asyncio.Lock()
         self._setup_tools()
 
     def _setup_tools(self):
@@ -80,7 +95,7 @@ class FastMCPDocumentAnalysisServer:
             )
 
         @self._mcp.tool()
-        async def find_relationships(doc_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        async def find_relationships(doc_id: str) -> Dict[str, List[Any]]:
             """Find relationships between documents.
 
             Args:
@@ -217,22 +232,54 @@ Document Schema:
         if self._initialized:
             return
 
-        # Initialize core services
-        self._doc_store = DocumentStore()
-        await self._doc_store.initialize()
+        # Concurrent first calls must not each build their own services
+        async with self._init_lock:
+            if self._initialized:
+                return
 
-        # Create Agent using pydantic model instead of AnthropicLLM
-        agent = AnthropicAgent(
-            api_key=os.environ.get("ANTHROPIC_API_KEY", ""),
-            model="claude-3-opus-20240229",
-        )
+            # Initialize core services
+            if self._doc_store is None:
+                self._doc_store = DocumentStore()
+            await self._doc_store.initialize()
+
+            # Create Agent using pydantic model instead of AnthropicLLM
+            self._agent = AnthropicAgent(
+                api_key=os.environ.get("ANTHROPIC_API_KEY", ""),
+                model="claude-3-opus-20240229",
+            )
+
+            self._analyzer = DocumentAnalyzer(self._agent, cache=LLMCache())
+
+            # Loading the tokenizer may download it, so keep it off the loop
+            await asyncio.to_thread(load_tokenizer)
+
+            # Initialize document tools
+            document_tools.init(self._doc_store, self._analyzer)
+
+            self._initialized = True
 
-        self._analyzer = DocumentAnalyzer(agent)
+            if settings.warmup:
+                self._warmup_task = asyncio.create_task(self._warmup())
 
-        # Initialize document tools
-        document_tools.init(self._doc_store, self._analyzer)
+    async def _warmup(self):
+        """Send a minimal request ahead of real traffic.
 
-        self._initialized = True
+        Opens the HTTP connection pool, so the first real request does not
+        pay the connection setup latency.
+        """
+        try:
+            await self._agent.generate("Reply with OK.")
+        except Exception as e:
+            logger.warning(f"Warm-up request failed: {e}")
+        else:
+            logger.info("Warm-up request completed")
+
+    async def close(self):
+        """Release the connections held by the server's services."""
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+        if self._agent is not None:
+            await self._agent.close()
 
     def app(self):
         """Get the FastAPI app instance.
@@ -335,6 +382,20 @@ Document Schema:
 
         return await self._doc_store.store_document(document)
 
+    async def store_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Store several documents at once using FastMCP capabilities.
+
+        Args:
+            documents: Documents to store
+
+        Returns:
+            List[str]: Document IDs
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        return await self._doc_store.store_documents(documents)
+
     async def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a document using FastMCP capabilities.
 
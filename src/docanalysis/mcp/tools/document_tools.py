@@ -3,24 +3,54 @@
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from datetime import datetime
+import asyncio
+import uuid
 
 from ...core.storage import DocumentStore
-from ...core.analysis import DocumentAnalyzer
+from ...core.analysis import DocumentAnalyzer, AnalysisResult
 
 
 # Global instances to be initialized by the server
 doc_store: DocumentStore = None
 analyzer: DocumentAnalyzer = None
 
+# Files larger than this are skipped by batch analysis
+MAX_FILE_SIZE = 8 * 1024 * 1024
 
-async def analyze_document(
+# Files analyzed concurrently by batch analysis
+BATCH_CONCURRENCY = 8
+
+
+def _is_text_file(file_path: Path) -> bool:
+    """Cheaply check whether a file looks like a non-empty text document.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        bool: False for empty, oversized or binary files
+    """
+    size = file_path.stat().st_size
+    if size == 0 or size > MAX_FILE_SIZE:
+        return False
+
+    # NUL bytes in the header are a reliable sign of binary content
+    with open(file_path, "rb") as f:
+        return b"\x00" not in f.read(512)
+
+
+async def _analyze_file(
     file_path: str,
     doc_type: Optional[str] = None,
     title: Optional[str] = None,
     reference_id: Optional[str] = None,
     category: Optional[str] = None,
-) -> Dict[str, Any]:
-    """Analyze a document file.
+) -> AnalysisResult:
+    """Read, store and analyze a document file.
+
+    Shared by the ``analyze_document`` tool and ``batch_analyze`` so that
+    internal loops call the analyzer directly instead of re-entering the
+    public tool function.
 
     Args:
         file_path: Path to document file
@@ -30,13 +60,17 @@ async def analyze_document(
         category: Document category
 
     Returns:
-        Dict[str, Any]: Analysis results
+        AnalysisResult: Analysis results
     """
     # Read document content
     content = Path(file_path).read_text()
 
-    # Generate document ID
-    doc_id = f"{doc_type or 'doc'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    # Generate document ID; the suffix keeps files analyzed in the same
+    # second, e.g. by batch_analyze, from overwriting each other
+    doc_id = (
+        f"{doc_type or 'doc'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        f"-{uuid.uuid4().hex[:8]}"
+    )
 
     # Create document
     doc = {
@@ -56,8 +90,35 @@ async def analyze_document(
     await doc_store.store_document(doc)
 
     # Analyze document
-    result = await analyzer.analyze_document(content=content, metadata=doc["metadata"])
+    return await analyzer.analyze_document(content=content, metadata=doc["metadata"])
+
 
+async def analyze_document(
+    file_path: str,
+    doc_type: Optional[str] = None,
+    title: Optional[str] = None,
+    reference_id: Optional[str] = None,
+    category: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Analyze a document file.
+
+    Args:
+        file_path: Path to document file
+        doc_type: Document type (e.g., contract, report)
+        title: Document title
+        reference_id: Reference document ID
+        category: Document category
+
+    Returns:
+        Dict[str, Any]: Analysis results
+    """
+    result = await _analyze_file(
+        file_path=file_path,
+        doc_type=doc_type,
+        title=title,
+        reference_id=reference_id,
+        category=category,
+    )
     return result.model_dump()
 
 
@@ -88,14 +149,15 @@ async def summarize_document(
     return summary.model_dump()
 
 
-async def find_relationships(doc_id: str) -> Dict[str, List[Dict[str, Any]]]:
+async def find_relationships(doc_id: str) -> Dict[str, List[Any]]:
     """Find document relationships.
 
     Args:
         doc_id: Document ID
 
     Returns:
-        Dict[str, List[Dict[str, Any]]]: Document relationships
+        Dict[str, List[Any]]: Similar, referenced and referencing documents,
+            plus ``related_ids`` listing the IDs of all of them once
     """
     # Get similar documents
     similar_docs = await doc_store.find_similar_documents(doc_id)
@@ -111,10 +173,16 @@ async def find_relationships(doc_id: str) -> Dict[str, List[Dict[str, Any]]]:
     if ref_id:
         referenced_doc = await doc_store.get_document(ref_id)
 
+    references = [referenced_doc] if referenced_doc else []
+    referenced_by = await doc_store.find_referencing_documents(doc_id)
+
     return {
         "similar": similar_docs,
-        "references": [referenced_doc] if referenced_doc else [],
-        "referenced_by": [],  # TODO: Implement reverse reference lookup
+        "references": references,
+        "referenced_by": referenced_by,
+        "related_ids": sorted(
+            {d["id"] for d in similar_docs + references + referenced_by}
+        ),
     }
 
 
@@ -135,20 +203,12 @@ async def search_documents(
     Returns:
         List[Dict[str, Any]]: Matching documents
     """
-    if start_date and end_date:
-        docs = await doc_store.find_documents_by_date(start_date, end_date)
-    else:
-        # Get all documents
-        docs = []
-        # TODO: Implement get_all_documents in DocumentStore
-
-    # Apply filters
-    if doc_type:
-        docs = [d for d in docs if d["metadata"]["type"] == doc_type]
-    if category:
-        docs = [d for d in docs if d["metadata"]["category"] == category]
-
-    return docs
+    return await doc_store.search_documents(
+        start_date=start_date,
+        end_date=end_date,
+        doc_type=doc_type,
+        category=category,
+    )
 
 
 async def find_entity(entity: str) -> List[Dict[str, Any]]:
@@ -189,6 +249,10 @@ async def batch_analyze(
 ) -> List[Dict[str, Any]]:
     """Analyze all documents in a directory.
 
+    Empty, binary and oversized (see ``MAX_FILE_SIZE``) files are skipped;
+    files that cannot be read are reported with an error. Up to
+    ``BATCH_CONCURRENCY`` files are analyzed at a time.
+
     Args:
         directory: Directory path
         recursive: Whether to process subdirectories
@@ -200,19 +264,27 @@ async def batch_analyze(
     pattern = "**/*" if recursive else "*"
     files = [f for f in path.glob(pattern) if f.is_file()]
 
-    results = []
-    for file_path in files:
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def analyze(file_path: Path) -> Optional[Dict[str, Any]]:
         try:
-            result = await analyze_document(
-                file_path=str(file_path),
-                doc_type="unknown",
-                title=file_path.stem,
-            )
-            results.append({"file": str(file_path), "analysis": result})
+            # Checked here so a file that vanished or cannot be opened only
+            # fails its own entry
+            if not _is_text_file(file_path):
+                return None
+            async with semaphore:
+                result = await _analyze_file(
+                    file_path=str(file_path),
+                    doc_type="unknown",
+                    title=file_path.stem,
+                )
+            return {"file": str(file_path), "analysis": result.model_dump()}
         except Exception as e:
-            results.append({"file": str(file_path), "error": str(e)})
+            return {"file": str(file_path), "error": str(e)}
 
-    return results
+    # Overlap the LLM latency of independent files
+    results = await asyncio.gather(*(analyze(f) for f in files))
+    return [result for result in results if result is not None]
 
 
 def init(store: DocumentStore, doc_analyzer: DocumentAnalyzer):
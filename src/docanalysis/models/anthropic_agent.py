@@ -1,7 +1,9 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
+import asyncio
 import logging
 
 import anthropic
+import httpx
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
@@ -19,21 +21,132 @@ class AnthropicAgent(BaseModel):
     def __init__(self, **data):
         super().__init__(**data)
         if self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            # One pooled client for every call keeps connections alive
+            # between requests instead of paying a TLS handshake each time
+            self.client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_keepalive_connections=32, max_connections=64
+                    ),
+                    timeout=60.0,
+                ),
+            )
+
+    async def close(self):
+        """Close the HTTP connections held by the client."""
+        if self.client:
+            await self.client.close()
+
+    @staticmethod
+    def _messages(prompt: str, prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Build the request messages for a prompt.
+
+        A prefix is sent as a separate content block marked for prompt
+        caching. The provider ignores the mark for blocks below its minimum
+        cacheable size (1024 tokens for most models), so short prefixes are
+        sent uncached.
+        """
+        if not prefix:
+            return [{"role": "user", "content": prompt}]
+
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prefix,
+                        "cache_control": {"type": "ephemeral"},
+                    },
+                    {"type": "text", "text": prompt},
+                ],
+            }
+        ]
 
-    async def generate(self, prompt: str, **kwargs) -> str:
+    async def generate(
+        self, prompt: str, prefix: Optional[str] = None, **kwargs
+    ) -> str:
         """Generate text using Anthropic model."""
         if not self.client:
             raise ValueError("AnthropicAgent not initialized with API key")
 
         try:
-            response = self.client.messages.create(
+            async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}],
+                messages=self._messages(prompt, prefix),
                 **kwargs,
-            )
-            return response.content[0].text
+            ) as stream:
+                return await stream.get_final_text()
         except Exception as e:
             logger.error(f"Error generating text with Anthropic: {e}")
             raise
+
+    async def generate_batch(
+        self,
+        prompts: Dict[str, str],
+        prefix: Optional[str] = None,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Dict[str, str]:
+        """Generate text for several prompts with the Message Batches API.
+
+        The batch is cancelled if it does not end within ``timeout`` or the
+        call is cancelled, so abandoned batches stop processing.
+
+        Args:
+            prompts: Prompts keyed by a caller-chosen ID
+            prefix: Fixed instructions shared by every prompt
+            poll_interval: Seconds to wait between batch status checks
+            timeout: Maximum seconds to wait for the batch to end, no limit
+                by default
+
+        Returns:
+            Dict[str, str]: Generated text keyed by prompt ID; prompts whose
+                request did not succeed are omitted
+
+        Raises:
+            TimeoutError: If the batch did not end within ``timeout``
+        """
+        if not self.client:
+            raise ValueError("AnthropicAgent not initialized with API key")
+
+        try:
+            batch = await self.client.messages.batches.create(
+                requests=[
+                    {
+                        "custom_id": custom_id,
+                        "params": {
+                            "model": self.model,
+                            "max_tokens": 2000,
+                            "messages": self._messages(prompt, prefix),
+                            **kwargs,
+                        },
+                    }
+                    for custom_id, prompt in prompts.items()
+                ]
+            )
+            try:
+                async with asyncio.timeout(timeout):
+                    while batch.processing_status != "ended":
+                        await asyncio.sleep(poll_interval)
+                        batch = await self.client.messages.batches.retrieve(batch.id)
+            except (TimeoutError, asyncio.CancelledError):
+                logger.warning(f"Cancelling unfinished batch {batch.id}")
+                await self.client.messages.batches.cancel(batch.id)
+                raise
+
+            responses = {}
+            async for entry in await self.client.messages.batches.results(batch.id):
+                if entry.result.type == "succeeded":
+                    responses[entry.custom_id] = entry.result.message.content[0].text
+                else:
+                    logger.warning(
+                        f"Batch request {entry.custom_id} {entry.result.type}"
+                    )
+            return responses
+        except Exception as e:
+            logger.error(f"Error generating batch with Anthropic: {e}")
+            raise
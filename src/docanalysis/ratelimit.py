@@ -0,0 +1,53 @@
+"""Client-side rate limiting for LLM calls."""
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """Token bucket limiting how fast a quantity can be consumed.
+
+    The bucket starts full and refills continuously at ``rate`` tokens per
+    ``per`` seconds, so short bursts up to ``capacity`` are allowed while the
+    sustained rate stays under the limit.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: float = None):
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per period
+            per: Period length in seconds
+            capacity: Maximum tokens held, ``rate`` by default
+        """
+        self.rate = rate / per
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Add the tokens accrued since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until the given number of tokens is available and take them.
+
+        Requests larger than the capacity are capped to it so they can still
+        proceed once the bucket is full.
+
+        Args:
+            tokens: Number of tokens to take
+        """
+        tokens = min(tokens, self.capacity)
+        # Waiters are served in order so large requests are not starved
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
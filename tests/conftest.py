@@ -0,0 +1,9 @@
+"""Shared fixtures for all tests."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run anyio tests on asyncio only, sharing one event loop per session."""
+    return "asyncio"
@@ -0,0 +1,48 @@
+"""Shared fixtures for integration tests."""
+
+import chromadb
+import pytest
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+from docanalysis.core.storage import DocumentStore
+
+
+class CountingEmbeddingFunction(EmbeddingFunction):
+    """Deterministic bag-of-letters embedding that counts embedded texts."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self.calls += len(input)
+        return [
+            [float(text.lower().count(c)) + 1.0 for c in "abcdefghijklmnopqrstuvwxyz"]
+            for text in input
+        ]
+
+
+@pytest.fixture(scope="session")
+def chroma_client():
+    """Create an in-process ChromaDB client."""
+    return chromadb.EphemeralClient(
+        settings=chromadb.Settings(anonymized_telemetry=False, allow_reset=True)
+    )
+
+
+@pytest.fixture
+def embedding_function():
+    """Create a local embedding function, avoiding the default model download."""
+    return CountingEmbeddingFunction()
+
+
+@pytest.fixture
+async def doc_store(chroma_client, embedding_function):
+    """Create a document store backed by the in-process ChromaDB client."""
+    store = DocumentStore(
+        collection_name="test_documents",
+        client=chroma_client,
+        embedding_function=embedding_function,
+    )
+    await store.initialize()
+    yield store
+    chroma_client.delete_collection(store.collection_name)
@@ -0,0 +1,128 @@
+"""Integration tests for the document store."""
+
+import io
+
+import pypdf
+import pytest
+
+from docanalysis.core.storage import DocumentStore
+
+
+@pytest.mark.anyio
+async def test_similar_documents_reuse_embeddings(doc_store, embedding_function):
+    """Test similarity search does not re-embed the reference document."""
+    for doc_id, content in [
+        ("contract-001", "Service agreement between TechCorp and Global"),
+        ("contract-002", "Service agreement between TechCorp and Acme"),
+        ("report-001", "Quarterly metrics: xyz xyz xyz"),
+    ]:
+        await doc_store.store_document(
+            {"id": doc_id, "content": content, "metadata": {"type": "doc"}}
+        )
+    embedded = embedding_function.calls
+
+    similar = await doc_store.find_similar_documents("contract-001", limit=1)
+
+    assert [doc["id"] for doc in similar] == ["contract-002"]
+    assert embedding_function.calls == embedded
+
+
+@pytest.mark.anyio
+async def test_store_documents_batch(doc_store):
+    """Test documents are stored in one write, replacing existing IDs."""
+    documents = [
+        {"id": f"doc-{i}", "content": f"Document {i}", "metadata": {"n": i}}
+        for i in range(4)
+    ]
+
+    ids = await doc_store.store_documents(documents)
+    await doc_store.store_document(
+        {"id": "doc-0", "content": "Revised", "metadata": {"n": 0}}
+    )
+
+    assert ids == ["doc-0", "doc-1", "doc-2", "doc-3"]
+    assert doc_store.collection.count() == 4
+    assert (await doc_store.get_document("doc-0"))["content"] == "Revised"
+
+
+@pytest.mark.anyio
+async def test_similar_documents_cached(doc_store, mocker):
+    """Test similarity results are cached until documents change or expire."""
+    for doc_id in ["doc-1", "doc-2"]:
+        await doc_store.store_document(
+            {"id": doc_id, "content": f"Agreement {doc_id}", "metadata": {}}
+        )
+    query = mocker.spy(doc_store.collection, "query")
+
+    first = await doc_store.find_similar_documents("doc-1")
+    first[0]["metadata"]["changed"] = True
+    second = await doc_store.find_similar_documents("doc-1")
+    assert "changed" not in second[0]["metadata"]
+    assert query.call_count == 1
+
+    await doc_store.store_document(
+        {"id": "doc-3", "content": "Agreement doc-3", "metadata": {}}
+    )
+    third = await doc_store.find_similar_documents("doc-1")
+    assert query.call_count == 2
+    assert len(third) == 2
+
+    doc_store.SIMILARITY_CACHE_TTL = 0
+    await doc_store.find_similar_documents("doc-1")
+    assert query.call_count == 3
+
+
+@pytest.mark.anyio
+async def test_pdf_text_cached(chroma_client, mocker):
+    """Test the same PDF bytes are only parsed once."""
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    pdf_bytes = buffer.getvalue()
+
+    store = DocumentStore(collection_name="test_pdf", client=chroma_client)
+    reader = mocker.spy(pypdf, "PdfReader")
+
+    first = store.prepare_document({"content": {"type": "pdf", "data": pdf_bytes}})
+    second = store.prepare_document(
+        {"content": pdf_bytes, "metadata": {"id": "contract-001"}}
+    )
+
+    assert first["content"] == second["content"]
+    assert reader.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_search_documents_index(doc_store, chroma_client, embedding_function):
+    """Test stored documents are indexed for search, also after a restart."""
+    await doc_store.store_documents(
+        [
+            {
+                "id": "contract-001",
+                "content": "Service agreement",
+                "metadata": {"type": "contract", "date": "2024-01-01"},
+            },
+            {
+                "id": "report-001",
+                "content": "Quarterly report",
+                "metadata": {"type": "report", "date": "2024-02-01"},
+            },
+        ]
+    )
+
+    found = await doc_store.search_documents(doc_type="contract")
+    assert [doc["id"] for doc in found] == ["contract-001"]
+
+    # A new store over the same collection rebuilds its index from ChromaDB
+    restarted = DocumentStore(
+        collection_name=doc_store.collection_name,
+        client=chroma_client,
+        embedding_function=embedding_function,
+    )
+    await restarted.initialize()
+    found = await restarted.search_documents(start_date="2024-01-15")
+    assert [doc["id"] for doc in found] == ["report-001"]
+
+    await restarted.clear()
+    assert await restarted.search_documents() == []
@@ -0,0 +1,103 @@
+"""Integration tests for the MCP document tools."""
+
+from pathlib import Path
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from docanalysis.core.analysis import DocumentAnalyzer
+from docanalysis.mcp.tools import document_tools
+
+
+@pytest.fixture
+def llm():
+    """Create an LLM service whose responses fall back to pattern extraction."""
+    return Mock(generate=AsyncMock(return_value="No analysis available."))
+
+
+@pytest.fixture
+def tools(doc_store, llm):
+    """Initialize the document tools with the test store and mock LLM."""
+    document_tools.init(doc_store, DocumentAnalyzer(llm))
+    return document_tools
+
+
+@pytest.mark.anyio
+async def test_find_relationships_references(tools, doc_store):
+    """Test references are found in both directions and related IDs merged."""
+    await doc_store.store_documents(
+        [
+            {
+                "id": "contract-001",
+                "content": "Service agreement between TechCorp and Global",
+                "metadata": {"type": "contract"},
+            },
+            {
+                "id": "amendment-001",
+                "content": "Amendment extending the service agreement",
+                "metadata": {"type": "amendment", "reference_id": "contract-001"},
+            },
+            {
+                "id": "report-001",
+                "content": "Quarterly metrics report",
+                "metadata": {"type": "report"},
+            },
+        ]
+    )
+
+    contract = await tools.find_relationships("contract-001")
+    amendment = await tools.find_relationships("amendment-001")
+
+    assert [doc["id"] for doc in contract["referenced_by"]] == ["amendment-001"]
+    assert contract["references"] == []
+    assert [doc["id"] for doc in amendment["references"]] == ["contract-001"]
+    assert amendment["referenced_by"] == []
+
+    # The amendment is both similar to and referencing the contract, but its
+    # ID is listed once
+    assert contract["related_ids"] == ["amendment-001", "report-001"]
+    assert amendment["related_ids"] == ["contract-001", "report-001"]
+
+
+@pytest.mark.anyio
+async def test_batch_analyze_skips_unusable_files(tools, tmp_path, monkeypatch):
+    """Test empty, binary and oversized files are skipped, unreadable reported."""
+    monkeypatch.setattr(tools, "MAX_FILE_SIZE", 64)
+    (tmp_path / "contract.txt").write_text("Contract with Acme Holdings Inc.")
+    (tmp_path / "empty.txt").write_text("")
+    (tmp_path / "image.bin").write_bytes(b"\x89PNG\x00\x00\x00")
+    (tmp_path / "large.txt").write_text("x" * 65)
+    (tmp_path / "latin1.txt").write_bytes("Caf\xe9 contract".encode("latin-1"))
+
+    results = await tools.batch_analyze(str(tmp_path))
+
+    by_name = {Path(result["file"]).name: result for result in results}
+    assert sorted(by_name) == ["contract.txt", "latin1.txt"]
+    analysis = by_name["contract.txt"]["analysis"]
+    assert analysis["key_entities"] == ["Acme Holdings Inc."]
+    assert "error" in by_name["latin1.txt"]
+
+
+@pytest.mark.anyio
+async def test_batch_analyze_concurrency(tools, llm, tmp_path, monkeypatch):
+    """Test no more than BATCH_CONCURRENCY files are analyzed at a time."""
+    monkeypatch.setattr(tools, "BATCH_CONCURRENCY", 2)
+    in_flight = peak = 0
+
+    async def generate(prompt, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "No analysis available."
+
+    llm.generate.side_effect = generate
+    for i in range(6):
+        (tmp_path / f"doc-{i}.txt").write_text(f"Document {i}")
+
+    results = await tools.batch_analyze(str(tmp_path))
+
+    assert len(results) == 6
+    assert peak == 2
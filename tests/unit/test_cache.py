@@ -0,0 +1,37 @@
+"""Tests for the LLM response cache backends."""
+
+from docanalysis.cache import DiskBackend, LLMCache, MemoryBackend
+
+
+def test_memory_backend_evicts_least_recently_used():
+    """Test the memory backend keeps only the most recently used entries."""
+    backend = MemoryBackend(max_size=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+    assert backend.get("c") == "3"
+
+
+def test_disk_backend_persists(tmp_path):
+    """Test the disk backend keeps entries across instances."""
+    path = str(tmp_path / "cache.db")
+    DiskBackend(path).set("key", "value")
+
+    backend = DiskBackend(path)
+    assert backend.get("key") == "value"
+
+    backend.delete("key")
+    assert backend.get("key") is None
+
+
+def test_cache_key_depends_on_request():
+    """Test cache keys change with any part of the request."""
+    key = LLMCache.cache_key("model", ["prompt"], 0.0, ["v1"])
+
+    assert key == LLMCache.cache_key("model", ["prompt"], 0.0, ["v1"])
+    assert key != LLMCache.cache_key("model", ["other"], 0.0, ["v1"])
+    assert key != LLMCache.cache_key("model", ["prompt"], 0.0, ["v2"])
@@ -0,0 +1,369 @@
+"""Tests for the core document analyzer."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from docanalysis.cache import LLMCache
+from docanalysis.core.analysis import (
+    DocumentAnalyzer,
+    _chunk_document,
+    _scan_values,
+    estimate_tokens,
+)
+from docanalysis.core.types import AnalysisConfig
+
+
+# Canned responses, serialized once for the whole module as compact JSON
+_ANALYSIS_JSON = json.dumps(
+    {
+        "document_type": "contract",
+        "key_entities": [
+            "TechCorp Solutions Inc.",
+            "Global Enterprises Ltd.",
+        ],
+        "monetary_values": [50000],
+        "dates": ["2024-01-01", "2024-12-31"],
+        "key_info": {"duration": "12 months"},
+        "source_doc_id": "contract-001",
+    },
+    separators=(",", ":"),
+)
+
+_SUMMARY_JSON = json.dumps(
+    {
+        "content": "Service agreement between TechCorp and Global.",
+        "key_points": ["12 month term", "$50,000 total value"],
+        "detail_level": "brief",
+        "word_count": 6,
+    },
+    separators=(",", ":"),
+)
+
+_INFO_JSON = json.dumps(
+    {
+        "parties": ["TechCorp Solutions Inc.", "Global Enterprises Ltd."],
+        "amounts": ["$50,000"],
+    },
+    separators=(",", ":"),
+)
+
+_SAMPLE_DOCUMENT = {
+    "content": (
+        "Service Agreement between TechCorp Solutions Inc. and Global "
+        "Enterprises Ltd. effective 2024-01-01 for a period of 12 months, "
+        "ending 2024-12-31. Total contract value: $50,000."
+    ),
+    "metadata": {"id": "contract-001", "type": "contract"},
+}
+
+
+# Responses keyed by the first word of the instruction prefix
+_RESPONSES = {"Analyze": _ANALYSIS_JSON, "Generate": _SUMMARY_JSON}
+
+
+def _dispatch(prompt, prefix="", **kwargs):
+    """Pick the canned response matching the request's instructions."""
+    return _RESPONSES.get(prefix.partition(" ")[0], _INFO_JSON)
+
+
+class MockLLMService:
+    """LLM service returning canned JSON responses based on the prompt."""
+
+    def __init__(self):
+        self.generate = AsyncMock(side_effect=_dispatch)
+
+
+@pytest.fixture
+def mock_llm():
+    """Create a mock LLM service."""
+    return MockLLMService()
+
+
+@pytest.fixture
+def document_analyzer(mock_llm):
+    """Create a document analyzer backed by the mock LLM service."""
+    return DocumentAnalyzer(mock_llm)
+
+
+@pytest.fixture(scope="module")
+def sample_document():
+    """Provide the sample contract document, shared as tests only read it."""
+    return _SAMPLE_DOCUMENT
+
+
+@pytest.mark.anyio
+async def test_document_analysis(document_analyzer, sample_document):
+    """Test analysis results are parsed from the LLM response."""
+    result = await document_analyzer.analyze_document(**sample_document)
+
+    assert result.document_type == "contract"
+    assert "TechCorp Solutions Inc." in result.key_entities
+    assert result.monetary_values == [50000]
+    assert result.dates == ["2024-01-01", "2024-12-31"]
+    assert result.source_doc_id == "contract-001"
+
+
+@pytest.mark.anyio
+async def test_document_summary(document_analyzer, sample_document):
+    """Test summaries are parsed from the LLM response."""
+    summary = await document_analyzer.summarize_document(
+        **sample_document, detail_level="brief"
+    )
+
+    assert summary.detail_level == "brief"
+    assert len(summary.key_points) == 2
+    assert summary.source_doc_id == "contract-001"
+
+
+@pytest.mark.anyio
+async def test_info_extraction(document_analyzer, sample_document):
+    """Test extracted information is returned by type."""
+    info = await document_analyzer.extract_info(
+        **sample_document, info_types=["parties", "amounts"]
+    )
+
+    assert info["amounts"] == ["$50,000"]
+    assert len(info["parties"]) == 2
+
+
+@pytest.mark.anyio
+async def test_analysis_fallback(mock_llm, document_analyzer, sample_document):
+    """Test pattern-based extraction is used when the response is unusable."""
+    mock_llm.generate.side_effect = None
+    mock_llm.generate.return_value = "I cannot analyze this document."
+
+    result = await document_analyzer.analyze_document(**sample_document)
+
+    assert result.key_entities == [
+        "TechCorp Solutions Inc.",
+        "Global Enterprises Ltd.",
+    ]
+    assert result.monetary_values == [50000.0]
+    assert result.dates == ["2024-01-01", "2024-12-31"]
+    assert result.key_info == {"durations": ["12 months"]}
+    assert result.source_doc_id == "contract-001"
+
+
+def test_fallback_scan_long_capitalized_text():
+    """Test pattern extraction stays fast on long runs of capitalized words."""
+    content = "WORD " * 50_000 + "signed by Acme Holdings Inc."
+
+    start = time.perf_counter()
+    entities, _, _, _ = _scan_values(content)
+    elapsed = time.perf_counter() - start
+
+    assert entities == ["Acme Holdings Inc."]
+    # Linear scanning takes well under 0.1s; backtracking over the run of
+    # capitalized words would take minutes
+    assert elapsed < 1.0
+
+
+@pytest.mark.anyio
+async def test_batch_analysis(mock_llm, sample_document):
+    """Test larger document sets are analyzed through a single batch."""
+    document_analyzer = DocumentAnalyzer(
+        mock_llm, config=AnalysisConfig(use_batch_api=True)
+    )
+    responses = {
+        f"doc-{i}": json.dumps(
+            {
+                "document_type": "contract",
+                "key_entities": [],
+                "monetary_values": [],
+                "dates": [],
+                "key_info": {},
+                "source_doc_id": f"contract-{i}",
+            }
+        )
+        for i in range(3)
+    }
+    mock_llm.generate_batch = AsyncMock(return_value=responses)
+    documents = [sample_document] * 4
+
+    results = await document_analyzer.analyze_documents(documents)
+
+    mock_llm.generate_batch.assert_awaited_once()
+    mock_llm.generate.assert_not_awaited()
+    assert [r.source_doc_id for r in results[:3]] == [
+        "contract-0",
+        "contract-1",
+        "contract-2",
+    ]
+    # Requests missing from the batch results fall back to pattern extraction
+    assert results[3].monetary_values == [50000.0]
+
+
+@pytest.mark.anyio
+async def test_batch_analysis_chunks_long_documents(mock_llm, sample_document):
+    """Test documents too long for one request are chunked, not batched."""
+    document_analyzer = DocumentAnalyzer(
+        mock_llm, config=AnalysisConfig(use_batch_api=True)
+    )
+    mock_llm.generate_batch = AsyncMock(return_value={})
+    long_document = {
+        "content": "\n\n".join([sample_document["content"]] * 200),
+        "metadata": sample_document["metadata"],
+    }
+
+    results = await document_analyzer.analyze_documents(
+        [sample_document] * 3 + [long_document]
+    )
+
+    prompts = mock_llm.generate_batch.await_args.args[0]
+    assert sorted(prompts) == ["doc-0", "doc-1", "doc-2"]
+    assert mock_llm.generate_batch.await_args.kwargs["timeout"] == 3600.0
+    assert mock_llm.generate.await_count > 1
+    assert results[3].document_type == "contract"
+
+
+@pytest.mark.anyio
+async def test_cached_analysis(mock_llm, sample_document):
+    """Test repeated analyses are served from the response cache."""
+    cache = LLMCache()
+    document_analyzer = DocumentAnalyzer(mock_llm, cache=cache)
+
+    first = await document_analyzer.analyze_document(**sample_document)
+    second = await document_analyzer.analyze_document(**sample_document)
+
+    assert first == second
+    mock_llm.generate.assert_awaited_once()
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+@pytest.mark.anyio
+async def test_unparseable_response_not_cached(mock_llm, sample_document):
+    """Test refusals are retried instead of served from the cache."""
+    mock_llm.generate.side_effect = None
+    mock_llm.generate.return_value = "I cannot analyze this document."
+    document_analyzer = DocumentAnalyzer(mock_llm, cache=LLMCache())
+
+    await document_analyzer.analyze_document(**sample_document)
+    await document_analyzer.analyze_document(**sample_document)
+
+    assert mock_llm.generate.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_uncached_when_sampling(mock_llm, sample_document):
+    """Test responses are not cached at non-zero temperature."""
+    document_analyzer = DocumentAnalyzer(
+        mock_llm, config=AnalysisConfig(temperature=0.7), cache=LLMCache()
+    )
+
+    await document_analyzer.analyze_document(**sample_document)
+    await document_analyzer.analyze_document(**sample_document)
+
+    assert mock_llm.generate.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_packed_analysis(mock_llm, document_analyzer, sample_document):
+    """Test several documents are analyzed with one request per pack."""
+    mock_llm.generate.side_effect = None
+    mock_llm.generate.return_value = json.dumps(
+        [
+            {"document_type": "contract", "source_doc_id": f"contract-{i}"}
+            for i in range(3)
+        ]
+    )
+
+    results = await document_analyzer.analyze_documents_packed(
+        [sample_document] * 5, pack_size=3
+    )
+
+    assert mock_llm.generate.await_count == 2
+    assert [r.source_doc_id for r in results[:3]] == [
+        "contract-0",
+        "contract-1",
+        "contract-2",
+    ]
+    # The second pack's response has the wrong length, so it falls back
+    assert results[3].monetary_values == [50000.0]
+
+
+@pytest.mark.anyio
+async def test_chunked_analysis(mock_llm, document_analyzer, sample_document):
+    """Test long documents are analyzed in chunks and merged."""
+    content = "\n\n".join([sample_document["content"]] * 200)
+
+    result = await document_analyzer.analyze_document(
+        content=content, metadata=sample_document["metadata"]
+    )
+
+    assert mock_llm.generate.await_count > 1
+    assert result.key_entities == [
+        "TechCorp Solutions Inc.",
+        "Global Enterprises Ltd.",
+    ]
+    assert result.dates == ["2024-01-01", "2024-12-31"]
+
+
+def test_chunks_within_token_budget(sample_document):
+    """Test chunks stay within budget with separators and overlap counted."""
+    content = "\n\n".join([sample_document["content"]] * 200)
+
+    chunks = _chunk_document(content, max_tokens=1000, overlap=100)
+
+    assert len(chunks) > 1
+    assert max(estimate_tokens(chunk) for chunk in chunks) <= 1000
+
+
+@pytest.mark.anyio
+async def test_concurrency_limit_shared(mock_llm, sample_document):
+    """Test chunks of concurrently analyzed documents share one request limit."""
+    in_flight = peak = 0
+
+    async def generate(prompt, prefix="", **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return _dispatch(prompt, prefix)
+
+    mock_llm.generate.side_effect = generate
+    document_analyzer = DocumentAnalyzer(
+        mock_llm, config=AnalysisConfig(max_concurrency=2)
+    )
+    long_document = {
+        "content": "\n\n".join([sample_document["content"]] * 200),
+        "metadata": sample_document["metadata"],
+    }
+
+    await document_analyzer.analyze_documents([long_document] * 3)
+
+    assert mock_llm.generate.await_count > 3
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_analysis_prompt_key_fields(mock_llm, document_analyzer, sample_document):
+    """Test the configured key fields for the document type are requested."""
+    await document_analyzer.analyze_document(**sample_document)
+
+    prompt = mock_llm.generate.await_args.args[0]
+    assert "Key Fields to Extract: parties, value, duration" in prompt
+
+
+@pytest.mark.anyio
+async def test_reference_linking(document_analyzer, sample_document):
+    """Test documents referencing each other are linked both ways."""
+    amendment = {
+        "content": "Amendment extending the term to 2025-06-30.",
+        "metadata": {
+            "id": "amendment-001",
+            "type": "amendment",
+            "reference_id": "contract-001",
+        },
+    }
+
+    results = await document_analyzer.analyze_documents(
+        [sample_document, amendment, amendment]
+    )
+
+    assert results[0].related_docs == ["amendment-001"]
+    assert results[1].related_docs == ["contract-001"]
@@ -1,7 +1,7 @@
 """Tests for the MCP protocol communication."""
 
 import io
-import anyio
+import json
 import pytest
 from mcp.server.stdio import stdio_server
 from mcp.types import (
@@ -13,124 +13,129 @@ from mcp.types import (
     CallToolResult,
 )
 
+# Requests sent to the server, reused to check what it reads back
+EXPECTED_INIT = JSONRPCMessage(
+    root=JSONRPCRequest(jsonrpc="2.0", id=1, method="initialize", params={})
+)
+EXPECTED_CALL = JSONRPCMessage(
+    root=JSONRPCRequest(
+        jsonrpc="2.0",
+        id=2,
+        method="call_tool",
+        params={
+            "name": "analyze_document",
+            "arguments": {"file_path": "test.pdf"},
+        },
+    )
+)
+
+
+class InMemoryAsyncFile:
+    """Async file interface over an in-memory file for stdio_server.
+
+    anyio.AsyncFile runs every read and write in a worker thread; in-memory
+    files never block, so this calls them directly.
+    """
+
+    def __init__(self, file):
+        self.file = file
+
+    async def __aiter__(self):
+        for line in self.file:
+            yield line
+
+    async def write(self, data):
+        return self.file.write(data)
+
+    async def flush(self):
+        self.file.flush()
+
 
 @pytest.mark.anyio
 async def test_mcp_protocol_stdio():
     """Test basic stdio server protocol communication."""
-    stdin = io.StringIO()
+    # stdio_server parses each stdin line with model_validate_json, which
+    # accepts bytes, but writes str to stdout
+    stdin = io.BytesIO()
     stdout = io.StringIO()
 
-    # Prepare test messages
-    messages = [
-        # Test capabilities request
-        JSONRPCMessage(
-            root=JSONRPCRequest(jsonrpc="2.0", id=1, method="initialize", params={})
-        ),
-        # Test analyze document request
-        JSONRPCMessage(
-            root=JSONRPCRequest(
-                jsonrpc="2.0",
-                id=2,
-                method="call_tool",
-                params={
-                    "name": "analyze_document",
-                    "arguments": {"file_path": "test.pdf"},
-                },
-            )
-        ),
-    ]
+    # Test capabilities and analyze document requests
+    messages = [EXPECTED_INIT, EXPECTED_CALL]
 
-    # Write test messages to stdin
-    for message in messages:
-        stdin.write(message.model_dump_json(by_alias=True, exclude_none=True) + "\n")
+    # Write test messages to stdin in one go
+    stdin.write(
+        b"".join(
+            message.model_dump_json(by_alias=True, exclude_none=True).encode() + b"\n"
+            for message in messages
+        )
+    )
     stdin.seek(0)
 
-    async with anyio.create_task_group() as tg:
-        # Set up stdio server
-        async with stdio_server(
-            stdin=anyio.AsyncFile(stdin), stdout=anyio.AsyncFile(stdout)
-        ) as (read_stream, write_stream):
-            # Process initialize request
-            message = await anext(read_stream)
-            if isinstance(message, Exception):
-                raise message
-
-            # Verify initialize request
-            assert message == JSONRPCMessage(
-                root=JSONRPCRequest(jsonrpc="2.0", id=1, method="initialize", params={})
-            )
-
-            # Send initialize response
-            await write_stream.send(
-                JSONRPCMessage(
-                    root=JSONRPCResponse(
-                        jsonrpc="2.0",
-                        id=1,
-                        result=ServerCapabilities(
-                            name="Document Analysis",
-                            version="1.0.0",
-                            description="Document analysis, summarization, and relationship mapping",
-                        ).model_dump(),
-                    )
+    # Set up stdio server
+    async with stdio_server(
+        stdin=InMemoryAsyncFile(stdin), stdout=InMemoryAsyncFile(stdout)
+    ) as (read_stream, write_stream):
+        # Process initialize request
+        message = await anext(read_stream)
+        assert not isinstance(message, Exception)
+
+        # Verify initialize request
+        assert message == EXPECTED_INIT
+
+        # Send initialize response
+        await write_stream.send(
+            JSONRPCMessage(
+                root=JSONRPCResponse(
+                    jsonrpc="2.0",
+                    id=1,
+                    result=ServerCapabilities(
+                        name="Document Analysis",
+                        version="1.0.0",
+                        description="Document analysis, summarization, and relationship mapping",
+                    ).model_dump(),
                 )
             )
+        )
 
-            # Wait for the response to be written
-            await anyio.sleep(0.1)
+        # Process analyze document request
+        message = await anext(read_stream)
+        assert not isinstance(message, Exception)
 
-            # Process analyze document request
-            message = await anext(read_stream)
-            if isinstance(message, Exception):
-                raise message
+        # Verify analyze document request
+        assert message == EXPECTED_CALL
 
-            # Verify analyze document request
-            assert message == JSONRPCMessage(
-                root=JSONRPCRequest(
+        # Send analyze document response
+        await write_stream.send(
+            JSONRPCMessage(
+                root=JSONRPCResponse(
                     jsonrpc="2.0",
                     id=2,
-                    method="call_tool",
-                    params={
-                        "name": "analyze_document",
-                        "arguments": {"file_path": "test.pdf"},
-                    },
+                    result=CallToolResult(
+                        content=[TextContent(type="text", text="Analyzed test.pdf")]
+                    ).model_dump(),
                 )
             )
+        )
 
-            # Send analyze document response
-            await write_stream.send(
-                JSONRPCMessage(
-                    root=JSONRPCResponse(
-                        jsonrpc="2.0",
-                        id=2,
-                        result=CallToolResult(
-                            content=[TextContent(type="text", text="Analyzed test.pdf")]
-                        ).model_dump(),
-                    )
-                )
-            )
-
-            # Wait for the response to be written
-            await anyio.sleep(0.1)
-
-            # Cancel the task group to clean up
-            tg.cancel_scope.cancel()
+        # Closing the stream lets the writer flush and stop, so leaving the
+        # context waits for all responses to be written
+        await write_stream.aclose()
 
     # Verify output
-    stdout.seek(0)
-    output_lines = stdout.readlines()
+    output_lines = stdout.getvalue().splitlines()
     assert len(output_lines) == 2
 
-    received_responses = [
-        JSONRPCMessage.model_validate_json(line.strip()) for line in output_lines
-    ]
+    # Plain JSON is enough to check the fields below
+    received_responses = [json.loads(line) for line in output_lines]
+    assert all(r["jsonrpc"] == "2.0" for r in received_responses)
 
     # Verify initialize response
     init_response = received_responses[0]
-    assert init_response.root.id == 1
-    assert init_response.root.result["name"] == "Document Analysis"
-    assert init_response.root.result["version"] == "1.0.0"
+    assert init_response["id"] == 1
+    assert init_response["result"]["name"] == "Document Analysis"
+    assert init_response["result"]["version"] == "1.0.0"
 
     # Verify analyze document response
     analyze_response = received_responses[1]
-    assert analyze_response.root.id == 2
-    assert analyze_response.root.result["content"][0]["text"] == "Analyzed test.pdf"
+    assert analyze_response["id"] == 2
+    assert analyze_response["result"]["content"][0]["text"] == "Analyzed test.pdf"
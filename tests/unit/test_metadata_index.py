@@ -0,0 +1,69 @@
+"""Tests for the SQLite metadata index."""
+
+import pytest
+
+from docanalysis.core.index import MetadataIndex
+
+
+@pytest.fixture
+def metadata_index():
+    """Create an empty in-memory index."""
+    return MetadataIndex(":memory:")
+
+
+@pytest.mark.anyio
+async def test_metadata_index_search(metadata_index):
+    """Test combined date, type and category filtering."""
+    await metadata_index.add(
+        "contract-1", {"date": "2024-01-15", "type": "contract", "category": "legal"}
+    )
+    await metadata_index.add(
+        "report-1", {"date": "2024-02-01", "type": "report", "category": "finance"}
+    )
+    await metadata_index.add(
+        "contract-2", {"date": "2024-03-10", "type": "contract", "category": None}
+    )
+
+    assert await metadata_index.search() == ["contract-1", "report-1", "contract-2"]
+    assert await metadata_index.search(doc_type="contract") == [
+        "contract-1",
+        "contract-2",
+    ]
+    assert await metadata_index.search(
+        start_date="2024-01-01", end_date="2024-02-28"
+    ) == ["contract-1", "report-1"]
+    assert await metadata_index.search(
+        start_date="2024-01-01", doc_type="contract", category="legal"
+    ) == ["contract-1"]
+    assert await metadata_index.search(category="marketing") == []
+
+
+@pytest.mark.anyio
+async def test_metadata_index_replace(metadata_index):
+    """Test that re-adding a document replaces its entry."""
+    await metadata_index.add("doc-1", {"date": "2024-01-15", "type": "draft"})
+    await metadata_index.add("doc-1", {"date": "2024-01-16", "type": "contract"})
+
+    assert await metadata_index.search(doc_type="draft") == []
+    assert await metadata_index.search(doc_type="contract") == ["doc-1"]
+
+    await metadata_index.clear()
+    assert await metadata_index.search() == []
+
+
+@pytest.mark.anyio
+async def test_metadata_index_collections(tmp_path):
+    """Test indexes of different collections sharing a database stay apart."""
+    path = str(tmp_path / "index.db")
+    contracts = MetadataIndex(path, collection="contracts")
+    reports = MetadataIndex(path, collection="reports")
+    await contracts.add("doc-1", {"type": "contract"})
+    await reports.add("doc-1", {"type": "report"})
+    await reports.add("doc-2", {"type": "report"})
+
+    assert await contracts.search() == ["doc-1"]
+    assert await reports.search(doc_type="report") == ["doc-1", "doc-2"]
+
+    await reports.clear()
+    assert await reports.search() == []
+    assert await contracts.search() == ["doc-1"]
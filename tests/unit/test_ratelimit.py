@@ -0,0 +1,31 @@
+"""Tests for the client-side rate limiter."""
+
+import time
+
+import pytest
+
+from docanalysis.ratelimit import AsyncTokenBucket
+
+
+@pytest.mark.anyio
+async def test_bucket_allows_burst():
+    """Test acquisitions up to the capacity do not wait."""
+    bucket = AsyncTokenBucket(rate=10)
+
+    start = time.monotonic()
+    for _ in range(10):
+        await bucket.acquire()
+
+    assert time.monotonic() - start < 0.05
+
+
+@pytest.mark.anyio
+async def test_bucket_waits_for_refill():
+    """Test acquisitions beyond the capacity wait for tokens to refill."""
+    bucket = AsyncTokenBucket(rate=20, per=1.0, capacity=1)
+
+    start = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.04